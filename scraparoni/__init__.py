@@ -20,6 +20,7 @@ Components:
     - Scraparoni: Main scraper orchestrator
     - PhantomScraper: Lightning-fast curl-cffi scraper
     - BrowserScraper: Full Playwright browser automation
+    - AsyncBrowserScraper: Concurrent async Playwright rendering
     - Weaver: LLM-powered data extraction
         - ScraparoniAgent: Dynamic user-agent rotation
 """
@@ -30,8 +31,7 @@ __description__ = "Advanced LLM-powered web scraper with dual-mode scraping"
 
 # Core imports
 from .core import Scraparoni, quick_scrape, ScraparoniResponse
-from .scrapers import PhantomScraper, BrowserScraper, BaseScraper
-from .extractor import ScraparoniExtractor
+from .scrapers import PhantomScraper, BrowserScraper, AsyncBrowserScraper, BaseScraper, ScraparoniFetchError
 from .agents import ScraparoniAgent
 
 __all__ = [
@@ -42,7 +42,9 @@ __all__ = [
     # Scrapers
     "PhantomScraper",
     "BrowserScraper",
+    "AsyncBrowserScraper",
     "BaseScraper",
+    "ScraparoniFetchError",
     # Extraction
     "ScraparoniExtractor",
     # Agents
@@ -50,6 +52,14 @@ __all__ = [
 ]
 
 
+def __getattr__(name):
+    """Lazily import the extraction stack on first access (PEP 562)"""
+    if name == "ScraparoniExtractor":
+        from .extractor import ScraparoniExtractor
+        return ScraparoniExtractor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def banner():
     """Print Scraparoni banner"""
     print("""
@@ -3,13 +3,16 @@ Scraparoni - Main Orchestrator
 The core spider that weaves everything together
 """
 
+import asyncio
 import json
 from typing import Type, Optional, List, Dict, Any, Union
+from urllib.parse import urlsplit
+
+import orjson
 from pydantic import BaseModel
 
 from .agents import ScraparoniAgent
-from .scrapers import PhantomScraper, BrowserScraper
-from .extractor import ScraparoniExtractor
+from .scrapers import PhantomScraper, BrowserScraper, ScraparoniFetchError
 
 
 class ScraparoniResponse:
@@ -24,9 +27,17 @@ class ScraparoniResponse:
         """Return as Python dict"""
         return self._data.model_dump()
 
-    def json(self, indent: int = 2) -> str:
+    def json(self, indent: Optional[int] = 2) -> str:
         """Return as formatted JSON string with double quotes"""
-        return json.dumps(self._data.model_dump(), indent=indent)
+        data = self._data.model_dump(mode="json")
+
+        # orjson only supports compact or 2-space output; other widths use stdlib json,
+        # also emitting raw UTF-8 so the encoding doesn't depend on indent
+        if indent == 2:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+        if indent is None:
+            return orjson.dumps(data).decode()
+        return json.dumps(data, indent=indent, ensure_ascii=False)
 
     def model(self) -> BaseModel:
         """Return the raw Pydantic model"""
@@ -55,7 +66,9 @@ class Scraparoni:
 
     def __init__(
         self,
-        model_name: str = "Qwen/Qwen2.5-7B-Instruct-1M",
+        model_name: str = "Qwen/Qwen2.5-7B-Instruct-AWQ",
+        quantization: Optional[str] = None,
+        cache_dir: Optional[str] = "~/.cache/scraparoni/extract",
         prefer_desktop: bool = True,
         sticky_agent: bool = False,
         verbose: bool = False,
@@ -65,6 +78,8 @@ class Scraparoni:
 
         Args:
             model_name: HuggingFace model for extraction
+            quantization: Weight quantization of model_name ("awq", "gptq", "fp8"); None auto-detects from the checkpoint
+            cache_dir: On-disk extraction result cache directory (None disables caching)
             prefer_desktop: Use desktop user-agents by default
             sticky_agent: Keep same user-agent for session
             verbose: Show detailed loading progress
@@ -72,9 +87,17 @@ class Scraparoni:
         if verbose:
             print("🕸️  Initializing Scraparoni...")
 
+        # Imported here so scraper-only users never load the extraction stack
+        from .extractor import ScraparoniExtractor
+
         self.agent = ScraparoniAgent(prefer_desktop=prefer_desktop, sticky=sticky_agent)
         self.phantom = PhantomScraper(agent=self.agent)
-        self.weaver = ScraparoniExtractor(model_name=model_name, verbose=verbose)
+        self.weaver = ScraparoniExtractor(
+            model_name=model_name,
+            quantization=quantization,
+            cache_dir=cache_dir,
+            verbose=verbose,
+        )
 
         if verbose:
             print("✓ Scraparoni ready to weave!")
@@ -118,7 +141,7 @@ class Scraparoni:
                 if len(html) < 500 or '<body' not in html.lower():
                     print("⚠️  HTML appears empty, retrying with BrowserScraper...")
                     html = self._fetch_with_browser(url, **kwargs)
-            except Exception:
+            except ScraparoniFetchError:
                 html = self._fetch_with_browser(url, **kwargs)
         else:
             html = self.phantom.fetch(url, **kwargs)
@@ -238,32 +261,163 @@ class Scraparoni:
         schema: Type[BaseModel],
         instructions: Optional[str] = None,
         use_browser: bool = False,
+        auto_fallback: bool = True,
         **kwargs
     ) -> List[ScraparoniResponse]:
         """
         Scrape multiple URLs with same schema
 
+        Without use_browser, pages are fetched concurrently and extracted in
+        batches via scrape_many_async; URLs that fail or extract empty are then
+        retried in one shared BrowserScraper when auto_fallback is set.
+        Inside a running event loop (Jupyter, async apps) URLs are scraped one
+        by one instead; await scrape_many_async there for concurrency.
+
         Args:
             urls: List of URLs to scrape
             schema: Pydantic extraction schema
             instructions: Custom extraction instructions
             use_browser: Use browser scraper
+            auto_fallback: Retry failed/empty results with BrowserScraper (default: True)
             **kwargs: Scraper arguments
 
         Returns:
-            List of ScraparoniResponse objects
+            List of ScraparoniResponse objects (None for failed URLs)
         """
-        results = []
-        total = len(urls)
+        try:
+            asyncio.get_running_loop()
+            in_event_loop = True
+        except RuntimeError:
+            in_event_loop = False
+
+        # asyncio.run() can't nest inside a running loop: scrape sequentially there
+        if use_browser or in_event_loop:
+            results = []
+            for url in urls:
+                try:
+                    result = self.scrape(url, schema, instructions, use_browser, auto_fallback=auto_fallback, **kwargs)
+                    results.append(result)
+                except Exception as e:
+                    print(f"❌ Failed: {str(e)}")
+                    results.append(None)
+            return results
+
+        headless = kwargs.pop("headless", True)
+        results = asyncio.run(self.scrape_many_async(urls, schema, instructions, **kwargs))
+
+        retry = [
+            i for i, result in enumerate(results)
+            if result is None or self._is_empty_extraction(result.model())
+        ]
+        if auto_fallback and retry:
+            # One browser for the whole pass instead of a launch per failed URL
+            with BrowserScraper(agent=self.agent, headless=headless) as browser:
+                for i in retry:
+                    print("⚠️  Empty or failed result, retrying with BrowserScraper...")
+                    try:
+                        html = browser.fetch(urls[i], **kwargs)
+                        results[i] = ScraparoniResponse(self.weaver.extract(html, schema, instructions))
+                    except Exception as e:
+                        print(f"❌ Failed: {str(e)}")
 
-        for i, url in enumerate(urls, 1):
-            try:
-                result = self.scrape(url, schema, instructions, use_browser, **kwargs)
-                results.append(result)
-            except Exception as e:
-                print(f"❌ Failed: {str(e)}")
-                results.append(None)
+        return results
+
+    async def scrape_many_async(
+        self,
+        urls: List[str],
+        schema: Type[BaseModel],
+        instructions: Optional[str] = None,
+        max_concurrency: int = 20,
+        batch_size: int = 32,
+        **kwargs
+    ) -> List[Optional[ScraparoniResponse]]:
+        """
+        Scrape multiple URLs concurrently with PhantomScraper, extracting in batches
+
+        Pages are fetched over one curl-cffi AsyncSession and handed to the LLM
+        in batches of up to batch_size as they arrive, so network I/O overlaps
+        with GPU extraction.
+
+        Args:
+            urls: List of URLs to scrape
+            schema: Pydantic extraction schema
+            instructions: Custom extraction instructions
+            max_concurrency: Max in-flight HTTP requests (default: 20)
+            batch_size: Max pages per batched extraction call (default: 32)
+            **kwargs: PhantomScraper.fetch_async() arguments
+
+        Returns:
+            List of ScraparoniResponse objects in input order (None for failed URLs)
+        """
+        results: List[Optional[ScraparoniResponse]] = [None] * len(urls)
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(index: int, url: str, session) -> None:
+            html = None
+            async with semaphore:
+                try:
+                    html = await self.phantom.fetch_async(session, url, **kwargs)
+                except Exception as e:
+                    # Isolate failures per URL; one bad page must not abort the gather
+                    print(f"❌ Failed: {str(e)}")
+            await queue.put((index, html))
+
+        async def extract() -> None:
+            remaining = len(urls)
+            while remaining:
+                # Wait for one page, then drain whatever else has already arrived
+                batch = [await queue.get()]
+                while len(batch) < batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                remaining -= len(batch)
+
+                fetched = [(i, html) for i, html in batch if html is not None]
+                if not fetched:
+                    continue
+
+                # Run the blocking LLM call off the loop so fetches keep flowing
+                extracted = await asyncio.to_thread(
+                    self._extract_many,
+                    [html for _, html in fetched],
+                    schema,
+                    instructions
+                )
+                for (i, _), result in zip(fetched, extracted):
+                    if result is not None:
+                        results[i] = ScraparoniResponse(result)
+
+        async with self.phantom.async_session() as session:
+            await asyncio.gather(
+                extract(),
+                *(fetch(i, url, session) for i, url in enumerate(urls))
+            )
+
+        return results
 
+    def _extract_many(
+        self,
+        htmls: List[str],
+        schema: Type[BaseModel],
+        instructions: Optional[str],
+    ) -> List[Optional[BaseModel]]:
+        """Batch-extract pages; pages that fail come back as None"""
+        try:
+            # Unparseable pages come back as their ValueError instead of failing the batch
+            results = self.weaver.extract_batch(htmls, schema, instructions, return_exceptions=True)
+        except Exception:
+            # Batch-level failure: retry page by page (pages already parsed hit the cache)
+            results = []
+            for html in htmls:
+                try:
+                    results.append(self.weaver.extract(html, schema, instructions))
+                except Exception as e:
+                    results.append(e)
+
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                print(f"❌ Failed: {str(result)}")
+                results[i] = None
         return results
 
     # ========================================================================
@@ -346,8 +500,8 @@ class Scraparoni:
         Returns:
             True if extraction appears empty/failed
         """
-        data = result.model_dump()
-        values = list(data.values())
+        # Read field values directly instead of serializing with model_dump()
+        values = [getattr(result, name, None) for name in type(result).model_fields]
 
         if not values:
             return True
@@ -359,6 +513,25 @@ class Scraparoni:
         empty_ratio = none_count / len(values)
         return empty_ratio >= 0.8
 
+    def warmup(self, urls: Union[str, List[str]]) -> None:
+        """
+        Pre-connect to the hosts of urls so the first scrape() of each skips the handshake
+
+        Args:
+            urls: URL or list of URLs; each distinct host is contacted once
+        """
+        if isinstance(urls, str):
+            urls = [urls]
+
+        seen = set()
+        for url in urls:
+            host = urlsplit(url).netloc
+            if host in seen:
+                continue
+            seen.add(host)
+            if not self.phantom.warmup(url):
+                print(f"⚠️  Warmup failed for {host}")
+
     def rotate_agent(self) -> None:
         """Force user-agent rotation"""
         self.agent.rotate()
@@ -375,7 +548,8 @@ class Scraparoni:
 def quick_scrape(
     url: str,
     schema: Type[BaseModel],
-    model: str = "Qwen/Qwen2.5-7B-Instruct-1M",
+    model: str = "Qwen/Qwen2.5-7B-Instruct-AWQ",
+    quantization: Optional[str] = None,
     **kwargs
 ) -> ScraparoniResponse:
     """
@@ -385,10 +559,11 @@ def quick_scrape(
         url: Target URL
         schema: Pydantic extraction schema
         model: Model name
+        quantization: Weight quantization of model (None auto-detects from the checkpoint)
         **kwargs: Additional Scraparoni.scrape() arguments
 
     Returns:
         ScraparoniResponse with .json(), .dict(), .model() methods
     """
-    scraparoni = Scraparoni(model_name=model)
+    scraparoni = Scraparoni(model_name=model, quantization=quantization)
     return scraparoni.scrape(url, schema, **kwargs)
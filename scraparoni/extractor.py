@@ -3,14 +3,73 @@ Scraparoni - Intelligent LLM-based Data Extraction
 Transform raw HTML into structured data using local LLMs
 """
 
-import json
+import bisect
+import functools
+import hashlib
+import os
 import re
-from typing import Type, Optional, Dict, Any
+from typing import Type, Optional, Dict, Any, List, Iterator, Tuple
+
+import ahocorasick
+import diskcache
+import orjson
 from pydantic import BaseModel
+from selectolax.lexbor import LexborHTMLParser
+
+# Patterns compiled once at import instead of on every extraction call
+_JSON_TAG_RE = re.compile(r'<json>(.*?)</json>', re.DOTALL | re.IGNORECASE)
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+_WORD_RE = re.compile(r'\w+')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Placeholder marking where HTML token ids are spliced into a templated prompt
+_HTML_SLOT = "\x00scraparoni-html\x00"
+
+# Markup that costs prefill tokens but never carries extractable data
+_STRIP_TAGS = ["script", "style", "noscript", "svg", "iframe", "link"]
+_KEEP_ATTRS = frozenset({
+    "href", "src", "alt", "title", "class", "id",
+    "aria-label", "content", "datetime", "value",
+    "name", "property",  # label <meta name=...>/<meta property="og:..."> content
+})
+
+
+@functools.lru_cache(maxsize=64)
+def _schema_description(schema: Type[BaseModel]) -> Tuple[Dict[str, Any], str]:
+    """Return a schema's JSON schema and its prompt-ready JSON string (cached per class)"""
+    schema_json = schema.model_json_schema()
+    return schema_json, orjson.dumps(schema_json, option=orjson.OPT_INDENT_2).decode()
+
+
+@functools.lru_cache(maxsize=64)
+def _schema_keywords(schema: Type[BaseModel]) -> Tuple[str, ...]:
+    """Extract keywords from schema field names and descriptions (cached per class)"""
+    schema_json, _ = _schema_description(schema)
+    keywords = set()
+
+    for field_name, field_info in schema_json.get("properties", {}).items():
+        # Add field name
+        keywords.add(field_name.lower())
+
+        # Add words from description
+        description = field_info.get("description", "")
+        keywords.update(_WORD_RE.findall(description.lower()))
 
-# Import transformers at module level for consistency
-# This causes ~5-10s delay on import, but makes subsequent operations faster
-from transformers import AutoModelForCausalLM, AutoTokenizer
+    return tuple(keywords)
+
+
+def _default_kv_cache_dtype() -> str:
+    """Use an FP8 KV-cache on GPUs with native FP8 support (Ada/Hopper, sm_89+)"""
+    # vLLM's platform probe reads the capability via NVML; torch.cuda would
+    # initialize CUDA in this process and force vLLM's workers onto spawn
+    try:
+        from vllm.platforms import current_platform
+    except ImportError:
+        return "auto"
+
+    if current_platform.is_cuda() and current_platform.has_device_capability(89):
+        return "fp8"
+    return "auto"
 
 
 class ScraparoniExtractor:
@@ -21,18 +80,29 @@ class ScraparoniExtractor:
 
     def __init__(
         self,
-        model_name: str = "Qwen/Qwen2.5-7B-Instruct-1M",
-        device_map: str = "auto",
+        model_name: str = "Qwen/Qwen2.5-7B-Instruct-AWQ",
+        quantization: Optional[str] = None,
         dtype: str = "auto",
+        gpu_memory_utilization: float = 0.9,
+        max_model_len: int = 32768,
+        enable_prefix_caching: bool = True,
+        kv_cache_dtype: Optional[str] = None,
+        cache_dir: Optional[str] = "~/.cache/scraparoni/extract",
         verbose: bool = False,
     ):
         """
-        Initialize ScraparoniExtractor with a local LLM
+        Initialize ScraparoniExtractor with a local LLM served by vLLM
 
         Args:
             model_name: HuggingFace model identifier
-            device_map: Device mapping strategy
-            torch_dtype: Torch dtype for model
+            quantization: Weight quantization method ("awq", "gptq", "fp8"); None lets
+                vLLM detect it from the checkpoint (AWQ for the default model)
+            dtype: Activation dtype passed to vLLM
+            gpu_memory_utilization: Fraction of GPU memory vLLM may reserve
+            max_model_len: Max context length (prompt + generation) in tokens
+            enable_prefix_caching: Reuse KV-cache for the shared system prompt + schema prefix
+            kv_cache_dtype: KV-cache dtype ("fp8", "auto"); None picks fp8 on sm_89+ GPUs
+            cache_dir: Directory for the on-disk extraction result cache (None disables it)
             verbose: Show detailed loading progress
         """
         if verbose:
@@ -40,6 +110,10 @@ class ScraparoniExtractor:
 
         import sys
 
+        # Lazy import: transformers/vLLM add ~5-10s, so only pay it when an extractor is built
+        from transformers import AutoTokenizer
+        from vllm import LLM
+
         # Load tokenizer first (fast)
         if verbose:
             print(f"   📖 Loading tokenizer...", end="", flush=True)
@@ -52,17 +126,29 @@ class ScraparoniExtractor:
             print(f"   🧠 Loading model config and initializing...", end="", flush=True)
             sys.stdout.flush()
 
-        # Disable transformers progress bars
+        # Disable transformers/vLLM progress noise
         import logging
         logging.getLogger("transformers").setLevel(logging.ERROR)
+        logging.getLogger("vllm").setLevel(logging.ERROR)
 
-        self.model = AutoModelForCausalLM.from_pretrained(
-            model_name,
+        # vLLM engine: PagedAttention + continuous batching
+        self.llm = LLM(
+            model=model_name,
+            quantization=quantization,
             dtype=dtype,
-            device_map=device_map
-            
+            gpu_memory_utilization=gpu_memory_utilization,
+            max_model_len=max_model_len,
+            enable_prefix_caching=enable_prefix_caching,
+            kv_cache_dtype=kv_cache_dtype or _default_kv_cache_dtype(),
         )
 
+        # Tokenized chat-template prefix/suffix per (system prompt, user template)
+        self._prompt_affixes = functools.lru_cache(maxsize=64)(self._build_prompt_affixes)
+
+        # Greedy extractions are deterministic, so results are cached on disk
+        self.model_name = model_name
+        self._cache = diskcache.Cache(os.path.expanduser(cache_dir)) if cache_dir else None
+
         if verbose:
             print(f"\n✓ ScraparoniExtractor ready!")
 
@@ -71,10 +157,11 @@ class ScraparoniExtractor:
         html_content: str,
         schema: Type[BaseModel],
         instructions: Optional[str] = None,
-        max_length: int = 25000,
-        temperature: float = 0.2,
+        max_length: int = 6000,
+        temperature: float = 0.0,
         max_tokens: int = 4096,
         smart_chunking: bool = True,
+        preprocess: bool = True,
     ) -> BaseModel:
         """
         Extract structured data from HTML using LLM with smart chunking with ScraparoniExtractor   
@@ -83,10 +170,11 @@ class ScraparoniExtractor:
             html_content: Raw HTML content to extract from
             schema: Pydantic model defining extraction schema
             instructions: Additional extraction instructions
-            max_length: Max HTML characters per chunk (default: 25k for speed)
-            temperature: LLM temperature (lower = more deterministic)
+            max_length: Max HTML tokens per chunk (default: 6000)
+            temperature: LLM temperature (0 = greedy, deterministic decoding)
             max_tokens: Max tokens to generate
             smart_chunking: Use intelligent chunking for large HTML (default: True)
+            preprocess: Strip scripts, styles, comments and noise attributes first (default: True)
 
         Returns:
             Validated Pydantic model instance
@@ -94,80 +182,123 @@ class ScraparoniExtractor:
         Raises:
             ValueError: If JSON extraction or validation fails
         """
+        cache_key = None
+        if self._cache is not None and temperature <= 0:
+            cache_key = self._cache_key(
+                html_content,
+                schema,
+                instructions,
+                (max_length, max_tokens, smart_chunking, preprocess)
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return schema.model_validate_json(cached)
+
+        if preprocess:
+            html_content = self._preprocess_html(html_content)
+
+        # Tokenize once; chunks are slices of these ids, never re-tokenized
+        ids, offsets = self._tokenize_html(html_content)
+
         # If HTML is small enough, extract directly
-        if len(html_content) <= max_length or not smart_chunking:
-            return self._extract_single(
-                html_content[:max_length],
+        if len(ids) <= max_length or not smart_chunking:
+            result = self._extract_single(
+                ids[:max_length],
+                schema,
+                instructions,
+                temperature,
+                max_tokens
+            )
+        else:
+            # Large HTML - use smart chunking
+            result = self._extract_chunked(
+                html_content,
+                ids,
+                offsets,
                 schema,
                 instructions,
+                max_length,
                 temperature,
                 max_tokens
             )
 
-        # Large HTML - use smart chunking
-        return self._extract_chunked(
+        if cache_key is not None:
+            self._cache.set(cache_key, result.model_dump_json())
+
+        return result
+
+    def _cache_key(
+        self,
+        html_content: str,
+        schema: Type[BaseModel],
+        instructions: Optional[str],
+        options: tuple,
+    ) -> str:
+        """Content-addressed cache key for one extraction request"""
+        _, schema_description = _schema_description(schema)
+        digest = hashlib.blake2b(digest_size=32)
+        for part in (
+            self.model_name,
+            schema.__qualname__,
+            schema_description,
+            instructions or "",
+            repr(options),
             html_content,
-            schema,
-            instructions,
-            max_length,
-            temperature,
-            max_tokens
-        )
+        ):
+            digest.update(part.encode("utf-8", errors="surrogatepass"))
+            digest.update(b"\0")
+        return digest.hexdigest()
 
     def _extract_single(
         self,
-        html_content: str,
+        html_ids: List[int],
         schema: Type[BaseModel],
         instructions: Optional[str],
         temperature: float,
         max_tokens: int,
     ) -> BaseModel:
-        """Extract from a single HTML chunk"""
-        schema_json = schema.model_json_schema()
-        schema_description = json.dumps(schema_json, indent=2)
-
-        system_prompt = self._build_system_prompt()
-        user_prompt = self._build_user_prompt(
-            html_content,
-            schema_description,
-            instructions
-        )
-
-        response = self._generate(
-            system_prompt,
-            user_prompt,
+        """Extract from a single tokenized HTML chunk"""
+        response = self._generate_batch(
+            [self._extraction_prompt_ids(html_ids, schema, instructions)],
             temperature=temperature,
             max_tokens=max_tokens
-        )
+        )[0]
 
+        return self._parse_response(response, schema)
+
+    def _parse_response(self, response: str, schema: Type[BaseModel]) -> BaseModel:
+        """Parse LLM response JSON and validate it against the schema"""
         json_data = self._extract_json_from_tags(response)
         return schema.model_validate(json_data)
 
     def _extract_chunked(
         self,
         html_content: str,
+        ids: List[int],
+        offsets: List[Tuple[int, int]],
         schema: Type[BaseModel],
         instructions: Optional[str],
         chunk_size: int,
         temperature: float,
         max_tokens: int,
+        early_exit_batch: int = 4,
     ) -> BaseModel:
         """
         Extract from large HTML by splitting into chunks and finding relevant sections
-        Now tries ALL high-relevance chunks instead of stopping at first success
+        Tries high-relevance chunks best-first in batches of early_exit_batch,
+        returning the first complete result or else the one with the most data
         """
         # Get field descriptions to search for relevant sections
-        schema_json = schema.model_json_schema()
-        field_keywords = self._extract_keywords_from_schema(schema_json)
+        field_keywords = _schema_keywords(schema)
+        automaton = self._build_keyword_automaton(field_keywords)
 
-        # Split HTML into overlapping chunks
-        chunks = self._create_chunks(html_content, chunk_size, overlap=1000)
+        # Split HTML into overlapping token spans (sliced only when sent to the LLM)
+        spans = list(self._create_chunks(len(ids), chunk_size, overlap=250))
+        char_spans = [(offsets[start][0], offsets[end - 1][1]) for start, end in spans]
 
-        # Score each chunk by keyword relevance
-        scored_chunks = []
-        for i, chunk in enumerate(chunks):
-            score = self._score_chunk_relevance(chunk, field_keywords)
-            scored_chunks.append((score, i, chunk))
+        # Score each chunk by keyword relevance in a single pass over the HTML
+        scores = self._score_chunks(html_content, char_spans, automaton, len(field_keywords))
+        scored_chunks = [(score, i, span) for i, (score, span) in enumerate(zip(scores, spans))]
 
         # Sort by relevance
         scored_chunks.sort(reverse=True, key=lambda x: x[0])
@@ -175,22 +306,41 @@ class ScraparoniExtractor:
         # Try extraction from chunks with relevance > 0.4 (instead of just top 3)
         # This ensures we don't miss data spread across multiple sections
         # while avoiding low-quality chunks
+        relevant_chunks = [
+            ids[start:end]
+            for score, idx, (start, end) in scored_chunks
+            if score >= 0.4
+        ]
+
         best_result = None
         best_data_count = 0
+        # Parsed result (or parse error) of the top-ranked chunk, the last-resort answer
+        first_outcome = None
+
+        # Submit the most relevant chunks a batch at a time and stop as soon as
+        # one yields a complete result, so lower-ranked chunks never hit the LLM
+        for batch_start in range(0, len(relevant_chunks), early_exit_batch):
+            responses = self._generate_batch(
+                [
+                    self._extraction_prompt_ids(chunk_ids, schema, instructions)
+                    for chunk_ids in relevant_chunks[batch_start:batch_start + early_exit_batch]
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
 
-        for score, idx, chunk in scored_chunks:
-            # Skip chunks with low relevance
-            if score < 0.4:
-                break
+            for response in responses:
+                try:
+                    result = self._parse_response(response, schema)
+                except Exception as e:
+                    if first_outcome is None:
+                        first_outcome = e
+                    continue
+                if first_outcome is None:
+                    first_outcome = result
 
-            try:
-                result = self._extract_single(
-                    chunk,
-                    schema,
-                    instructions,
-                    temperature,
-                    max_tokens
-                )
+                if self._is_complete(result):
+                    return result
 
                 # Count non-empty data items
                 data = result.model_dump()
@@ -201,89 +351,270 @@ class ScraparoniExtractor:
                     best_data_count = data_count
                     best_result = result
 
-            except Exception as e:
-                continue
-
         # Return the result with the most data found
         if best_result and best_data_count > 0:
             return best_result
 
-        # If all chunks failed, try the first chunk as fallback
+        # All relevant chunks failed or came back empty: fall back to the top
+        # chunk, reusing its (deterministic) response rather than regenerating it
+        if first_outcome is not None:
+            if isinstance(first_outcome, Exception):
+                raise first_outcome
+            return first_outcome
+
+        start, end = scored_chunks[0][2]
         return self._extract_single(
-            scored_chunks[0][2],
+            ids[start:end],
             schema,
             instructions,
             temperature,
             max_tokens
         )
 
+    def _is_complete(self, result: BaseModel) -> bool:
+        """
+        Check whether every required field (or every field, if none are
+        required) holds a non-empty value
+        """
+        fields = type(result).model_fields
+        names = [name for name, field in fields.items() if field.is_required()] or list(fields)
+        return all(
+            getattr(result, name, None) not in (None, "", [], {})
+            for name in names
+        )
+
     def _count_data_items(self, data: dict) -> int:
-        """Count number of non-empty data items in extraction result"""
+        """Count non-empty leaf values in extraction result, including nested dicts/lists"""
         count = 0
-        for key, value in data.items():
-            if isinstance(value, list):
-                count += len([item for item in value if item and item != {} and item != []])
-            elif value and value != "" and value != {} and value != []:
+        stack = [data]
+
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, list):
+                stack.extend(value)
+            elif value is not None and value != "":
                 count += 1
+
         return count
 
-    def _extract_keywords_from_schema(self, schema_json: dict) -> list[str]:
-        """Extract keywords from schema field descriptions"""
-        keywords = []
-        properties = schema_json.get("properties", {})
+    def _preprocess_html(self, html_content: str) -> str:
+        """
+        Reduce HTML to the markup the LLM actually needs
 
-        for field_name, field_info in properties.items():
-            # Add field name
-            keywords.append(field_name.lower())
+        Drops script/style/svg/iframe elements, comments, inline data URIs and
+        presentation-only attributes, then collapses whitespace. Typically cuts
+        prompt tokens several-fold without losing visible content or links.
+        """
+        tree = LexborHTMLParser(html_content)
+        tree.strip_tags(_STRIP_TAGS)
+
+        if tree.root is None:
+            return _WHITESPACE_RE.sub(" ", html_content).strip()
 
-            # Add words from description
-            description = field_info.get("description", "")
-            words = re.findall(r'\w+', description.lower())
-            keywords.extend(words)
+        comments = []
+        for node in tree.root.traverse():
+            if node.is_comment_node:
+                comments.append(node)
+                continue
+            if not node.is_element_node:
+                continue
 
-        return list(set(keywords))
+            attrs = node.attrs
+            for name, value in list(attrs.items()):
+                if name not in _KEEP_ATTRS or (value and value.startswith("data:")):
+                    del attrs[name]
 
-    def _create_chunks(self, text: str, chunk_size: int, overlap: int) -> list[str]:
-        """Split text into overlapping chunks"""
-        chunks = []
+        for node in comments:
+            node.decompose()
+
+        return _WHITESPACE_RE.sub(" ", tree.html).strip()
+
+    def _tokenize_html(self, html_content: str) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """Tokenize HTML once, returning token ids and each token's (start, end) character offsets"""
+        encoding = self.tokenizer(
+            html_content,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+        )
+        return encoding["input_ids"], encoding["offset_mapping"]
+
+    def _create_chunks(
+        self,
+        token_count: int,
+        chunk_size: int,
+        overlap: int,
+    ) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) token spans of overlapping chunk_size-token windows"""
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1 token, got {chunk_size}")
+
+        # Keep the stride positive for small chunk sizes (overlap >= chunk_size never advances)
+        overlap = min(overlap, chunk_size // 4)
         start = 0
 
-        while start < len(text):
-            end = start + chunk_size
-            chunks.append(text[start:end])
+        while start < token_count:
+            end = min(start + chunk_size, token_count)
+            yield start, end
+            if end == token_count:
+                break
             start += chunk_size - overlap
 
-        return chunks
+    def _build_keyword_automaton(self, keywords: Tuple[str, ...]) -> Optional[ahocorasick.Automaton]:
+        """Build an Aho-Corasick automaton matching all keywords in one pass"""
+        if not keywords:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
 
-    def _score_chunk_relevance(self, chunk: str, keywords: list[str]) -> float:
-        """Score chunk by keyword density"""
-        chunk_lower = chunk.lower()
-        matches = sum(1 for keyword in keywords if keyword in chunk_lower)
-        return matches / len(keywords) if keywords else 0
+    def _score_chunks(
+        self,
+        text: str,
+        spans: List[Tuple[int, int]],
+        automaton: Optional[ahocorasick.Automaton],
+        keyword_count: int,
+    ) -> List[float]:
+        """
+        Score every chunk span by the fraction of distinct keywords it contains
+
+        Scans the text once and buckets each match into the spans that fully
+        contain it, instead of re-scanning every overlapping chunk.
+        """
+        if automaton is None or not keyword_count:
+            return [0.0] * len(spans)
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Lowercasing changed the length (e.g. 'İ' -> 'i̇'), so match offsets
+            # no longer line up with spans: scan each span on its own instead
+            return [
+                len({keyword for _, keyword in automaton.iter(text[start:end].lower())}) / keyword_count
+                for start, end in spans
+            ]
+
+        starts = [start for start, _ in spans]
+        ends = [end for _, end in spans]
+        found: List[set] = [set() for _ in spans]
+
+        for end_idx, keyword in automaton.iter(lowered):
+            match_start = end_idx - len(keyword) + 1
+            # Spans are sorted by both start and end, so containing spans are contiguous
+            first = bisect.bisect_left(ends, end_idx + 1)
+            last = bisect.bisect_right(starts, match_start)
+            for i in range(first, last):
+                found[i].add(keyword)
+
+        return [len(keywords) / keyword_count for keywords in found]
 
     def extract_batch(
         self,
         html_contents: list[str],
         schema: Type[BaseModel],
         instructions: Optional[str] = None,
-        **kwargs
+        max_length: int = 6000,
+        temperature: float = 0.0,
+        max_tokens: int = 4096,
+        smart_chunking: bool = True,
+        preprocess: bool = True,
+        return_exceptions: bool = False,
     ) -> list[BaseModel]:
         """
         Extract data from multiple HTML documents
 
+        Documents that fit in a single prompt are submitted together in one
+        batched vLLM call; oversized documents go through smart chunking.
+        Each result is cached as soon as it parses, so a failing document
+        never costs the others their generation.
+
         Args:
             html_contents: List of HTML strings
             schema: Pydantic schema
             instructions: Extraction instructions
-            **kwargs: Additional extract() arguments
+            max_length: Max HTML tokens per chunk (default: 6000)
+            temperature: LLM temperature (0 = greedy decoding)
+            max_tokens: Max tokens to generate
+            smart_chunking: Use intelligent chunking for large HTML (default: True)
+            preprocess: Strip scripts, styles, comments and noise attributes first (default: True)
+            return_exceptions: Put a document's ValueError in its result slot
+                instead of raising it (default: False)
 
         Returns:
-            List of validated Pydantic instances
+            List of validated Pydantic instances (or ValueErrors with return_exceptions)
+
+        Raises:
+            ValueError: If JSON extraction or validation fails and return_exceptions is False
         """
-        results = []
+        results: list[Any] = [None] * len(html_contents)
+        failure: Optional[ValueError] = None
+        cache_keys: Dict[int, str] = {}
+        single_ids: Dict[int, List[int]] = {}
+
         for i, html in enumerate(html_contents):
-            result = self.extract(html, schema, instructions, **kwargs)
-            results.append(result)
+            if self._cache is not None and temperature <= 0:
+                cache_keys[i] = self._cache_key(
+                    html,
+                    schema,
+                    instructions,
+                    (max_length, max_tokens, smart_chunking, preprocess)
+                )
+                cached = self._cache.get(cache_keys[i])
+                if cached is not None:
+                    results[i] = schema.model_validate_json(cached)
+                    continue
+
+            if preprocess:
+                html = self._preprocess_html(html)
+            ids, offsets = self._tokenize_html(html)
+            if len(ids) <= max_length or not smart_chunking:
+                single_ids[i] = ids[:max_length]
+                continue
+
+            try:
+                results[i] = self._extract_chunked(
+                    html,
+                    ids,
+                    offsets,
+                    schema,
+                    instructions,
+                    max_length,
+                    temperature,
+                    max_tokens
+                )
+            except ValueError as e:
+                results[i] = e
+                failure = failure or e
+                continue
+            if i in cache_keys:
+                self._cache.set(cache_keys[i], results[i].model_dump_json())
+
+        if single_ids:
+            responses = self._generate_batch(
+                [
+                    self._extraction_prompt_ids(html_ids, schema, instructions)
+                    for html_ids in single_ids.values()
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            for i, response in zip(single_ids, responses):
+                try:
+                    results[i] = self._parse_response(response, schema)
+                except ValueError as e:
+                    results[i] = e
+                    failure = failure or e
+                    continue
+                if i in cache_keys:
+                    self._cache.set(cache_keys[i], results[i].model_dump_json())
+
+        # Raise only after every other document has been generated and cached
+        if failure is not None and not return_exceptions:
+            raise failure
+
         return results
 
     def _build_system_prompt(self) -> str:
@@ -301,7 +632,13 @@ class ScraparoniExtractor:
         schema: str,
         instructions: Optional[str]
     ) -> str:
-        """Build user prompt with HTML and schema"""
+        """
+        Build user prompt with HTML and schema
+
+        The schema and instructions come first and the HTML last, so every chunk
+        or document extracted with the same schema shares a token prefix that
+        vLLM's prefix cache can reuse.
+        """
         prompt = f"""Extract structured data from the HTML below according to this schema.
 
 SCHEMA:
@@ -315,64 +652,81 @@ HTML CONTENT:
 Extract the data and return it as valid JSON wrapped in <json></json> tags."""
         return prompt
 
-    def _generate(
+    def _build_prompt_affixes(
         self,
         system_prompt: str,
-        user_prompt: str,
-        temperature: float = 0.2,
-        max_tokens: int = 2048,
-    ) -> str:
+        user_template: str,
+    ) -> Tuple[List[int], List[int]]:
         """
-        Generate LLM response
+        Tokenize the chat-templated prompt around the HTML slot
 
-        Args:
-            system_prompt: System message
-            user_prompt: User message
-            temperature: Sampling temperature
-            max_tokens: Max tokens to generate
-
-        Returns:
-            Generated text
+        Returns the token ids before and after _HTML_SLOT, so each chunk only
+        has its own (already tokenized) HTML ids spliced in between.
         """
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-
-        # Apply chat template
         text = self.tokenizer.apply_chat_template(
-            messages,
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_template}
+            ],
             tokenize=False,
             add_generation_prompt=True
         )
+        prefix, suffix = text.split(_HTML_SLOT)
+        return (
+            self.tokenizer.encode(prefix, add_special_tokens=False),
+            self.tokenizer.encode(suffix, add_special_tokens=False),
+        )
 
-        # Tokenize
-        model_inputs = self.tokenizer(
-            [text],
-            return_tensors="pt"
-        ).to(self.model.device)
-
-        # Generate
-        generated_ids = self.model.generate(
-            **model_inputs,
-            max_new_tokens=max_tokens,
-            temperature=temperature,
-            top_p=0.9,
-            do_sample=temperature > 0,
+    def _extraction_prompt_ids(
+        self,
+        html_ids: List[int],
+        schema: Type[BaseModel],
+        instructions: Optional[str],
+    ) -> List[int]:
+        """Assemble the full extraction prompt as token ids"""
+        _, schema_description = _schema_description(schema)
+        prefix_ids, suffix_ids = self._prompt_affixes(
+            self._build_system_prompt(),
+            self._build_user_prompt(_HTML_SLOT, schema_description, instructions)
         )
+        return prefix_ids + list(html_ids) + suffix_ids
 
-        # Decode only new tokens
-        generated_ids = [
-            output_ids[len(input_ids):]
-            for input_ids, output_ids in zip(model_inputs.input_ids, generated_ids)
-        ]
+    def _generate_batch(
+        self,
+        prompt_ids: List[List[int]],
+        temperature: float = 0.0,
+        max_tokens: int = 2048,
+    ) -> List[str]:
+        """
+        Generate LLM responses for several tokenized prompts in a single vLLM call
 
-        response = self.tokenizer.batch_decode(
-            generated_ids,
-            skip_special_tokens=True
-        )[0]
+        Args:
+            prompt_ids: Chat-templated prompt token ids, one list per generation
+            temperature: Sampling temperature (<= 0 selects greedy decoding)
+            max_tokens: Max tokens to generate per prompt
+
+        Returns:
+            Generated texts, in the same order as prompt_ids
+        """
+        from vllm import SamplingParams
 
-        return response
+        if temperature <= 0:
+            # Greedy argmax path: no top-p sort or multinomial sampling per token
+            sampling_params = SamplingParams(temperature=0.0, max_tokens=max_tokens)
+        else:
+            sampling_params = SamplingParams(
+                temperature=temperature,
+                top_p=0.9,
+                max_tokens=max_tokens,
+            )
+
+        # vLLM batches all prompts together and preserves input order
+        outputs = self.llm.generate(
+            [{"prompt_token_ids": ids} for ids in prompt_ids],
+            sampling_params,
+            use_tqdm=False,
+        )
+        return [output.outputs[0].text for output in outputs]
 
     def _extract_json_from_tags(self, text: str) -> Dict[str, Any]:
         """
@@ -387,27 +741,38 @@ Extract the data and return it as valid JSON wrapped in <json></json> tags."""
         Raises:
             ValueError: If no JSON tags found or invalid JSON
         """
-        # Try to find JSON in tags
-        pattern = r'<json>(.*?)</json>'
-        match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-
-        if not match:
-            # Fallback: try to find any JSON object
-            json_pattern = r'\{.*\}'
-            match = re.search(json_pattern, text, re.DOTALL)
-            if not match:
-                raise ValueError(
-                    f"No <json> tags or valid JSON found in LLM response.\n"
-                    f"Response: {text[:500]}..."
-                )
-            json_str = match.group(0)
+        # Fast path: exact lowercase tags located with str.find (no regex scan)
+        start = text.find("<json>")
+        end = text.find("</json>", start + 6) if start != -1 else -1
+
+        if start != -1 and end != -1:
+            json_str = text[start + 6:end].strip()
         else:
-            json_str = match.group(1).strip()
+            stripped = text.strip()
+            if stripped.startswith("{"):
+                # Bare JSON response without tags: try a strict parse first
+                try:
+                    return orjson.loads(stripped)
+                except orjson.JSONDecodeError:
+                    pass
+
+            # Fallback: case-insensitive tags, then any JSON object
+            match = _JSON_TAG_RE.search(text)
+            if match:
+                json_str = match.group(1).strip()
+            else:
+                match = _JSON_OBJ_RE.search(text)
+                if not match:
+                    raise ValueError(
+                        f"No <json> tags or valid JSON found in LLM response.\n"
+                        f"Response: {text[:500]}..."
+                    )
+                json_str = match.group(0)
 
         # Parse JSON
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
             raise ValueError(
                 f"Invalid JSON in LLM response: {str(e)}\n"
                 f"JSON string: {json_str[:500]}..."
@@ -419,7 +784,7 @@ Extract the data and return it as valid JSON wrapped in <json></json> tags."""
         prompt: str,
         temperature: float = 0.7,
         max_tokens: int = 2048,
-        max_html_length: int = 25000,
+        max_html_length: int = 6000,
     ) -> str:
         """
         Run custom extraction prompt without schema validation
@@ -429,21 +794,23 @@ Extract the data and return it as valid JSON wrapped in <json></json> tags."""
             prompt: Custom extraction prompt
             temperature: Sampling temperature
             max_tokens: Max tokens to generate
-            max_html_length: Max HTML chars to send (default: 25k)
+            max_html_length: Max HTML tokens to send (default: 6000)
 
         Returns:
             Raw LLM response
         """
         system_prompt = "You are Scraparoni, an expert web scraping and analysis AI. Do not hallucinate and produce fake data if not seen in the HTML."
 
-        user_prompt = f"""{prompt}
+        user_template = f"""{prompt}
 
 HTML CONTENT:
-{html_content[:max_html_length]}"""
+{_HTML_SLOT}"""
+
+        html_ids, _ = self._tokenize_html(html_content)
+        prefix_ids, suffix_ids = self._prompt_affixes(system_prompt, user_template)
 
-        return self._generate(
-            system_prompt,
-            user_prompt,
+        return self._generate_batch(
+            [prefix_ids + html_ids[:max_html_length] + suffix_ids],
             temperature=temperature,
             max_tokens=max_tokens
-        )
+        )[0]